@@ -0,0 +1,166 @@
+from __future__ import annotations
+
+import math
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from typing import Callable, Iterator
+
+
+class AdmissionRejected(Exception):
+    """Requête refusée par le contrôle d'admission (à traduire en 429)."""
+
+    def __init__(self, reason: str, retry_after: float):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+    @property
+    def retry_after_header(self) -> str:
+        return str(max(1, math.ceil(self.retry_after)))
+
+
+class TokenBucket:
+    """Seau à jetons : `rate` jetons par seconde, au plus `capacity` en réserve."""
+
+    __slots__ = ("rate", "capacity", "tokens", "updated")
+
+    def __init__(self, rate: float, capacity: float, now: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = now
+
+    def take(self, now: float) -> float:
+        """Consomme un jeton. Renvoie 0 si accepté, sinon le délai avant le prochain jeton."""
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def refund(self) -> None:
+        self.tokens = min(self.capacity, self.tokens + 1)
+
+
+class AdmissionController:
+    """Limite le nombre de générations simultanées et le débit par client.
+
+    - au plus `max_in_flight` appels en cours, les suivants attendent dans une
+      file FIFO bornée à `max_queue` pendant au plus `queue_timeout` secondes ;
+    - chaque client dispose d'un seau de `burst` jetons rechargé à
+      `rate_per_minute` jetons par minute ;
+    - tout refus lève `AdmissionRejected` avec un délai `Retry-After`.
+    """
+
+    def __init__(
+        self,
+        max_in_flight: int = 4,
+        max_queue: int = 16,
+        queue_timeout: float = 5.0,
+        rate_per_minute: float = 10.0,
+        burst: int = 5,
+        max_clients: int = 10_000,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.rate = rate_per_minute / 60.0
+        self.burst = burst
+        self.max_clients = max_clients
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._waiters: deque[threading.Event] = deque()
+        self._in_flight = 0
+        self._buckets: OrderedDict[str, TokenBucket] = OrderedDict()
+        self._stats = {
+            "admitted": 0,
+            "queued": 0,
+            "shed_rate_limited": 0,
+            "shed_queue_full": 0,
+            "shed_queue_timeout": 0,
+            "max_queue_depth": 0,
+            "total_wait_ms": 0.0,
+            "max_wait_ms": 0.0,
+        }
+
+    def _bucket(self, key: str, now: float) -> TokenBucket:
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = TokenBucket(self.rate, self.burst, now)
+            self._buckets[key] = bucket
+            # Éviction LRU pour borner la mémoire face à beaucoup d'IP distinctes
+            while len(self._buckets) > self.max_clients:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(key)
+        return bucket
+
+    def acquire(self, key: str) -> None:
+        start = self._clock()
+        with self._lock:
+            bucket = self._bucket(key, start)
+            wait = bucket.take(start)
+            if wait > 0:
+                self._stats["shed_rate_limited"] += 1
+                raise AdmissionRejected("rate_limited", wait)
+            if self._in_flight < self.max_in_flight and not self._waiters:
+                self._in_flight += 1
+                self._stats["admitted"] += 1
+                return
+            if len(self._waiters) >= self.max_queue:
+                bucket.refund()
+                self._stats["shed_queue_full"] += 1
+                raise AdmissionRejected("queue_full", self.queue_timeout)
+            event = threading.Event()
+            self._waiters.append(event)
+            self._stats["queued"] += 1
+            self._stats["max_queue_depth"] = max(self._stats["max_queue_depth"], len(self._waiters))
+
+        granted = event.wait(self.queue_timeout)
+        with self._lock:
+            # `release` retire l'attente et pose l'événement sous le verrou :
+            # on revérifie pour ne pas perdre un créneau transmis juste après le timeout.
+            if not granted and not event.is_set():
+                self._waiters.remove(event)
+                # La requête n'a pas été servie : le jeton est rendu au client
+                # (le bucket a pu être évincé entre-temps)
+                bucket = self._buckets.get(key)
+                if bucket is not None:
+                    bucket.refund()
+                self._stats["shed_queue_timeout"] += 1
+                raise AdmissionRejected("queue_timeout", self.queue_timeout)
+            waited_ms = (self._clock() - start) * 1000
+            self._stats["admitted"] += 1
+            self._stats["total_wait_ms"] += waited_ms
+            self._stats["max_wait_ms"] = max(self._stats["max_wait_ms"], waited_ms)
+
+    def release(self) -> None:
+        with self._lock:
+            if self._waiters:
+                # Le créneau est transmis directement au plus ancien en attente
+                self._waiters.popleft().set()
+            else:
+                self._in_flight -= 1
+
+    @contextmanager
+    def admit(self, key: str) -> Iterator[None]:
+        self.acquire(key)
+        try:
+            yield
+        finally:
+            self.release()
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["in_flight"] = self._in_flight
+            stats["queue_depth"] = len(self._waiters)
+            stats["tracked_clients"] = len(self._buckets)
+        stats["avg_wait_ms"] = round(stats["total_wait_ms"] / stats["admitted"], 2) if stats["admitted"] else 0.0
+        stats["total_wait_ms"] = round(stats["total_wait_ms"], 2)
+        stats["max_wait_ms"] = round(stats["max_wait_ms"], 2)
+        return stats
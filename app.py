@@ -1,13 +1,25 @@
 from __future__ import annotations
 
 import json
+import math
 import os
 import re
+import sys
+import unicodedata
+from bisect import bisect_left
+from collections import Counter
 from typing import Optional
 
 from dotenv import load_dotenv
-from flask import Flask, jsonify, render_template, request
+from flask import Flask, Response, abort, jsonify, render_template, request, send_file, url_for
+from itsdangerous import BadSignature, URLSafeSerializer
 from openai import OpenAI
+from werkzeug.middleware.proxy_fix import ProxyFix
+
+from admission import AdmissionController, AdmissionRejected
+from build_static import OUTPUT_DIR, guess_mimetype, load_manifest
+from history import HistoryCompactor, history_budget
+from upstream import CircuitBreaker, CircuitOpenError, DeadlineExceeded, UpstreamClient, is_retryable
 
 load_dotenv()
 
@@ -16,6 +28,7 @@ FICHES_PATH = os.path.join(APP_ROOT, "doc", "fiches.json")
 RESSOURCES_PATH = os.path.join(APP_ROOT, "doc", "ressources.json")
 FAQ_PATH = os.path.join(APP_ROOT, "doc", "faq.json")
 HOME_PATH = os.path.join(APP_ROOT, "doc", "home.json")
+PDF_PASSAGES_PATH = os.path.join(APP_ROOT, "doc", "pdf_passages.json")
 
 
 def load_json(path: str) -> list[dict]:
@@ -42,6 +55,49 @@ def load_page(path: str) -> Optional[dict]:
 
 app = Flask(__name__)
 
+# Nombre de proxys de confiance devant l'app (0 : X-Forwarded-For ignoré)
+TRUSTED_PROXY_HOPS = int(os.getenv("TRUSTED_PROXY_HOPS", "0"))
+if TRUSTED_PROXY_HOPS:
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=TRUSTED_PROXY_HOPS)
+
+# Pages pré-rendues par build_static.py (None si absentes ou obsolètes : rendu Jinja)
+PRERENDERED = load_manifest()
+
+
+@app.template_global()
+def asset_url(name: str) -> str:
+    if PRERENDERED and name in PRERENDERED["assets"]:
+        return "/" + PRERENDERED["assets"][name]
+    return url_for("static", filename=name)
+
+
+def send_prerendered(rel: str, immutable: bool = False) -> Response:
+    """Envoie un fichier pré-rendu (variante br/gzip si acceptée) avec ETag et 304."""
+    digest = PRERENDERED["files"].get(rel) if PRERENDERED else None
+    if digest is None:
+        abort(404)
+    path = os.path.join(OUTPUT_DIR, rel)
+    encoding = None
+    for enc, suffix in (("br", ".br"), ("gzip", ".gz")):
+        if request.accept_encodings[enc] > 0 and os.path.exists(path + suffix):
+            encoding, path = enc, path + suffix
+            break
+    etag = f"{digest}-{encoding}" if encoding else digest
+
+    if request.if_none_match.contains(etag):
+        resp = Response(status=304)
+    else:
+        resp = send_file(path, mimetype=guess_mimetype(rel), conditional=False, etag=False)
+        if encoding:
+            resp.headers["Content-Encoding"] = encoding
+    resp.set_etag(etag)
+    resp.vary.add("Accept-Encoding")
+    if immutable:
+        resp.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+    else:
+        resp.headers["Cache-Control"] = "no-cache"
+    return resp
+
 
 def _build_doc_entries() -> list[dict]:
     """Construit une liste à plat de documents (fiches, ressources, FAQ, home) pour la recherche."""
@@ -57,6 +113,7 @@ def _build_doc_entries() -> list[dict]:
         docs.append(
             {
                 "type": "fiche",
+                "slug": fiche.get("slug", ""),
                 "title": fiche.get("title", ""),
                 "url": fiche.get("url", ""),
                 "resume": fiche.get("resume", ""),
@@ -75,6 +132,7 @@ def _build_doc_entries() -> list[dict]:
         docs.append(
             {
                 "type": "ressource",
+                "slug": res.get("slug", ""),
                 "title": res.get("title", ""),
                 "url": res.get("url", ""),
                 "resume": res.get("resume", ""),
@@ -82,6 +140,14 @@ def _build_doc_entries() -> list[dict]:
             }
         )
 
+    # Passages extraits des PDF (ingest_pdfs.py) : un document par passage, rattaché
+    # à sa fiche/ressource (même URL, titre et résumé)
+    passages_by_url = {entry["url"]: entry["passages"] for entry in load_json(PDF_PASSAGES_PATH)}
+    for parent in [d for d in docs if d["url"] in passages_by_url]:
+        for passage in passages_by_url[parent["url"]]:
+            text_parts = [p for p in (parent["title"], parent["resume"], passage) if p]
+            docs.append({**parent, "passage": True, "text": "\n".join(text_parts)})
+
     faq_page = load_page(FAQ_PATH)
     if faq_page:
         text_parts = []
@@ -127,9 +193,105 @@ ALL_DOCS = _build_doc_entries()
 
 OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-4.1-mini")
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+OPENAI_FALLBACK_MODEL = os.getenv("OPENAI_FALLBACK_MODEL") or None
+OPENAI_HEDGE_AFTER = float(os.getenv("OPENAI_HEDGE_AFTER")) if os.getenv("OPENAI_HEDGE_AFTER") else None
 client: OpenAI | None = None
+upstream: UpstreamClient | None = None
 if OPENAI_API_KEY:
-    client = OpenAI(api_key=OPENAI_API_KEY)
+    # Les reprises sont gérées par UpstreamClient, pas par le SDK
+    client = OpenAI(api_key=OPENAI_API_KEY, max_retries=0)
+    upstream = UpstreamClient(
+        lambda model, messages, timeout: client.chat.completions.create(
+            model=model, messages=messages, timeout=timeout
+        ),
+        primary_model=OPENAI_MODEL,
+        fallback_model=OPENAI_FALLBACK_MODEL,
+        hedge_after=OPENAI_HEDGE_AFTER,
+        deadline=float(os.getenv("OPENAI_DEADLINE", "20")),
+        max_retries=int(os.getenv("OPENAI_MAX_RETRIES", "2")),
+        breaker=CircuitBreaker(
+            failure_threshold=int(os.getenv("OPENAI_BREAKER_THRESHOLD", "5")),
+            reset_timeout=float(os.getenv("OPENAI_BREAKER_RESET", "30")),
+        ),
+    )
+    # Résumés d'historique : appel court, sans secours, même disjoncteur
+    summary_upstream = UpstreamClient(
+        lambda model, messages, timeout: client.chat.completions.create(
+            model=model, messages=messages, timeout=timeout
+        ),
+        primary_model=os.getenv("OPENAI_SUMMARY_MODEL") or OPENAI_MODEL,
+        deadline=8.0,
+        max_retries=1,
+        breaker=upstream.breaker,
+    )
+
+HISTORY_TOKEN_BUDGET = int(os.getenv("CHAT_HISTORY_TOKENS") or history_budget(OPENAI_MODEL))
+
+
+def summarize_history(previous: str, messages: list[dict]) -> str:
+    """Prolonge le résumé de conversation avec de nouveaux échanges."""
+    transcript = "\n".join(
+        f"{'Utilisateur' if m['role'] == 'user' else 'Assistant'} : {m['content']}" for m in messages
+    )
+    completion = summary_upstream.complete([
+        {
+            "role": "system",
+            "content": "Tu résumes une conversation entre un utilisateur et l'assistant Solutions Transitions. "
+            "En 80 mots maximum, garde les besoins exprimés, le contexte de la collectivité et les titres "
+            "des fiches/ressources déjà proposées. Réponds uniquement par le résumé.",
+        },
+        {
+            "role": "user",
+            "content": f"Résumé précédent :\n{previous or '(aucun)'}\n\nNouveaux échanges :\n{transcript}",
+        },
+    ])
+    if not completion.choices:
+        return ""
+    return completion.choices[0].message.content or ""
+
+
+# Le résumé de conversation fait l'aller-retour avec le client, signé pour qu'il ne
+# puisse pas le modifier. Une clé aléatoire par processus rendrait le résumé illisible
+# pour les autres workers et après un redémarrage, alors que le client a déjà oublié
+# les messages résumés : sans SECRET_KEY, pas de résumé (l'historique est seulement tronqué).
+SECRET_KEY = os.getenv("SECRET_KEY")
+memory_signer = URLSafeSerializer(SECRET_KEY, salt="chat-memory") if SECRET_KEY else None
+if memory_signer is None:
+    print(
+        "[app.py] ATTENTION : SECRET_KEY non définie, résumé de l'historique désactivé "
+        "(les anciens échanges sont retirés du contexte au lieu d'être résumés).",
+        file=sys.stderr,
+    )
+compactor = HistoryCompactor(summarize_history if memory_signer else None)
+
+
+def load_memory(token) -> str:
+    if memory_signer is None or not isinstance(token, str) or not token:
+        return ""
+    try:
+        summary = memory_signer.loads(token)
+    except BadSignature:
+        return ""
+    return summary if isinstance(summary, str) else ""
+
+# Contrôle d'admission devant les appels de génération (les réponses sans appel
+# au modèle ne passent pas par la file)
+admission = AdmissionController(
+    max_in_flight=int(os.getenv("CHAT_MAX_IN_FLIGHT", "4")),
+    max_queue=int(os.getenv("CHAT_MAX_QUEUE", "16")),
+    queue_timeout=float(os.getenv("CHAT_QUEUE_TIMEOUT", "5")),
+    rate_per_minute=float(os.getenv("CHAT_RATE_PER_MINUTE", "10")),
+    burst=int(os.getenv("CHAT_RATE_BURST", "5")),
+)
+
+
+def client_key() -> str:
+    """Identifie le client pour la limitation de débit : son adresse IP.
+
+    `X-Forwarded-For` n'est pris en compte que derrière un proxy déclaré via
+    TRUSTED_PROXY_HOPS (ProxyFix réécrit alors `remote_addr`).
+    """
+    return f"ip:{request.remote_addr or 'unknown'}"
 
 
 def simple_tokenize(text: str) -> list[str]:
@@ -213,23 +375,208 @@ def count_occurrences(token: str, text_tokens: list[str], text_stems: list[str])
     return count
 
 
-def find_relevant_docs(question: str, top_k: int = 5) -> dict:
+def _index_doc(doc: dict) -> dict:
+    """Tokenise un document une fois pour toutes (réutilisé à chaque requête)."""
+    doc_tokens = simple_tokenize(doc["text"])
+    title_tokens = simple_tokenize(doc.get("title", ""))
+    resume_tokens = simple_tokenize(doc.get("resume", ""))
+    return {
+        "tokens": doc_tokens,
+        "stems": [simple_stem(t) for t in doc_tokens],
+        "title_tokens": set(title_tokens),
+        "title_stems": {simple_stem(t) for t in title_tokens},
+        "resume_tokens": set(resume_tokens),
+        "resume_stems": {simple_stem(t) for t in resume_tokens},
+    }
+
+
+DOC_INDEX = [_index_doc(doc) for doc in ALL_DOCS]
+
+
+def fold_accents(text: str) -> str:
+    """Minuscules sans accents (« Rénovation » -> « renovation »)."""
+    nfkd = unicodedata.normalize("NFKD", text.lower())
+    return "".join(c for c in nfkd if not unicodedata.combining(c))
+
+
+FUZZY_MAX_DISTANCE = 2
+# Poids d'un terme corrigé selon la distance d'édition (0 = accents seulement)
+FUZZY_WEIGHTS = {0: 0.85, 1: 0.7, 2: 0.55}
+
+
+def _max_distance(length: int) -> int:
+    """Distance d'édition tolérée selon la longueur du mot : les mots courts
+    (« pain », « rouge ») ont trop de voisins, on n'y corrige que les accents."""
+    if length < 6:
+        return 0
+    return 1 if length < 9 else FUZZY_MAX_DISTANCE
+
+
+def _deletes(term: str, max_distance: int) -> set[str]:
+    """Toutes les variantes de `term` obtenues en supprimant jusqu'à `max_distance` lettres."""
+    result = {term}
+    frontier = {term}
+    for _ in range(max_distance):
+        frontier = {w[:i] + w[i + 1:] for w in frontier if len(w) > 1 for i in range(len(w))}
+        result |= frontier
+    return result
+
+
+def edit_distance(a: str, b: str, max_distance: int) -> int:
+    """Distance de Damerau-Levenshtein (transpositions adjacentes), coupée à `max_distance` + 1."""
+    if abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+    prev2: list[int] = []
+    prev = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        cur = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            cur[j] = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                cur[j] = min(cur[j], prev2[j - 2] + 1)
+        if min(cur) > max_distance:
+            return max_distance + 1
+        prev2, prev = prev, cur
+    return prev[-1]
+
+
+def _build_fuzzy_index(index: list[dict]) -> tuple[Counter, set[str], dict[str, list[str]], dict[str, list[str]]]:
+    """Index de correction façon SymSpell, construit une fois avec le corpus.
+
+    - `vocab` : fréquence de chaque token du corpus ;
+    - `stems` : stems du vocabulaire (un token dont le stem est connu n'est pas corrigé) ;
+    - `folded` : forme sans accents -> tokens du corpus ;
+    - `deletes` : variantes par suppression de lettres -> formes sans accents.
+    """
+    vocab: Counter = Counter()
+    for indexed in index:
+        vocab.update(indexed["tokens"])
+    folded: dict[str, list[str]] = {}
+    for term in vocab:
+        folded.setdefault(fold_accents(term), []).append(term)
+    deletes: dict[str, list[str]] = {}
+    for form in folded:
+        # Indexé à la distance tolérée pour les requêtes plus longues que le terme
+        for d in _deletes(form, _max_distance(len(form) + FUZZY_MAX_DISTANCE)):
+            deletes.setdefault(d, []).append(form)
+    return vocab, {simple_stem(t) for t in vocab}, folded, deletes
+
+
+VOCAB, VOCAB_STEMS, VOCAB_FOLDED, VOCAB_DELETES = _build_fuzzy_index(DOC_INDEX)
+
+
+def correct_token(token: str) -> Optional[tuple[str, int]]:
+    """Terme du corpus le plus proche de `token` (accents ignorés) et sa distance,
+    ou None si aucun n'est à distance <= `FUZZY_MAX_DISTANCE`."""
+    form = fold_accents(token)
+    max_distance = _max_distance(len(form))
+    candidates: set[str] = set()
+    for d in _deletes(form, max_distance):
+        candidates.update(VOCAB_DELETES.get(d, ()))
+
+    best: Optional[tuple[int, int, str]] = None
+    for candidate in candidates:
+        distance = 0 if candidate == form else edit_distance(form, candidate, max_distance)
+        if distance > max_distance:
+            continue
+        term = max(VOCAB_FOLDED[candidate], key=VOCAB.__getitem__)
+        key = (distance, -VOCAB[term], term)
+        if best is None or key < best:
+            best = key
+    return (best[2], best[0]) if best else None
+
+
+def _build_prefix_index(docs: list[dict]) -> tuple[list[str], list[list[int]]]:
+    """Index trié des termes des titres (tokens et stems, sans accents) des fiches
+    et ressources : `terms[i]` apparaît dans les documents `postings[i]`."""
+    postings: dict[str, set[int]] = {}
+    for i, doc in enumerate(docs):
+        if doc["type"] not in ("fiche", "ressource") or doc.get("passage"):
+            continue
+        for tok in simple_tokenize(doc.get("title", "")):
+            for term in (fold_accents(tok), fold_accents(simple_stem(tok))):
+                postings.setdefault(term, set()).add(i)
+    terms = sorted(postings)
+    return terms, [sorted(postings[t]) for t in terms]
+
+
+PREFIX_TERMS, PREFIX_POSTINGS = _build_prefix_index(ALL_DOCS)
+
+
+def suggest_docs(query: str, limit: int = 8) -> list[dict]:
+    """Autocomplétion : fiches/ressources dont le titre contient tous les mots de la
+    requête, le dernier pouvant être incomplet (recherche par préfixe)."""
+    words = re.findall(r"[a-z0-9]+", fold_accents(query))
+    if not words:
+        return []
+    # Les mots complets courts ou vides sont ignorés, le dernier (en cours de saisie) est gardé
+    words = [w for w in words[:-1] if len(w) > 2 and w not in STOP_WORDS] + words[-1:]
+
+    scores: dict[int, int] = {}
+    for n, word in enumerate(words):
+        matched: dict[int, int] = {}
+        i = bisect_left(PREFIX_TERMS, word)
+        while i < len(PREFIX_TERMS) and PREFIX_TERMS[i].startswith(word):
+            quality = 2 if PREFIX_TERMS[i] == word else 1
+            for doc_id in PREFIX_POSTINGS[i]:
+                if matched.get(doc_id, 0) < quality:
+                    matched[doc_id] = quality
+            i += 1
+        if n == 0:
+            scores = matched
+        else:
+            scores = {d: scores[d] + q for d, q in matched.items() if d in scores}
+        if not scores:
+            return []
+
+    ranked = sorted(
+        scores,
+        key=lambda d: (-scores[d], ALL_DOCS[d]["type"] != "fiche", len(ALL_DOCS[d]["title"])),
+    )
+    return [doc_summary(ALL_DOCS[d]) for d in ranked[:limit]]
+
+
+def doc_summary(doc: dict) -> dict:
+    return {
+        "type": doc["type"],
+        "title": doc["title"],
+        "url": doc["url"],
+        "resume": doc.get("resume", ""),
+    }
+
+
+def find_relevant_docs(question: str, top_k: int = 5, log: bool = True) -> dict:
     """Renvoie les documents les plus pertinents avec seuil de pertinence."""
     q_tokens = filter_stop_words(simple_tokenize(question))
     if not q_tokens:
-        return {"docs": [], "has_relevant_results": False, "top_score": 0}
+        return {"docs": [], "has_relevant_results": False, "top_score": 0, "corrections": {}}
+    
+    # Correction des fautes : un token inconnu du corpus (ni lui ni son stem) est
+    # remplacé par le terme le plus proche, avec un poids réduit
+    corrections: dict[str, str] = {}
+    weighted_tokens: list[tuple[str, float]] = []
+    for tok in q_tokens:
+        if tok not in VOCAB and simple_stem(tok) not in VOCAB_STEMS:
+            corrected = correct_token(tok)
+            if corrected:
+                corrections[tok] = corrected[0]
+                weighted_tokens.append((corrected[0], FUZZY_WEIGHTS[corrected[1]]))
+                continue
+        weighted_tokens.append((tok, 1.0))
+    q_tokens = [tok for tok, _ in weighted_tokens]
     
     # Expansion avec synonymes
     expanded_tokens = expand_query(q_tokens)
     
     scored: list[dict] = []
-    for doc in ALL_DOCS:
-        doc_tokens = simple_tokenize(doc["text"])
-        doc_stems = [simple_stem(t) for t in doc_tokens]
-        title_tokens = simple_tokenize(doc.get("title", ""))
-        title_stems = [simple_stem(t) for t in title_tokens]
-        resume_tokens = simple_tokenize(doc.get("resume", ""))
-        resume_stems = [simple_stem(t) for t in resume_tokens]
+    for doc, indexed in zip(ALL_DOCS, DOC_INDEX):
+        doc_tokens = indexed["tokens"]
+        doc_stems = indexed["stems"]
+        title_tokens = indexed["title_tokens"]
+        title_stems = indexed["title_stems"]
+        resume_tokens = indexed["resume_tokens"]
+        resume_stems = indexed["resume_stems"]
         
         if not doc_tokens:
             continue
@@ -243,32 +590,33 @@ def find_relevant_docs(question: str, top_k: int = 5) -> dict:
             score += 2.0
         
         # Scoring pour chaque token de la requête ORIGINALE (priorité haute)
-        for tok in q_tokens:
+        # (les tokens corrigés comptent avec leur poids < 1)
+        for tok, weight in weighted_tokens:
             stem = simple_stem(tok)
             
             # Match exact dans le titre : TRÈS IMPORTANT (+15)
             if tok in title_tokens:
-                score += 15.0
+                score += 15.0 * weight
                 title_matches += 1
             # Match stem dans le titre : +10
-            elif any(ts == stem for ts in title_stems):
-                score += 10.0
+            elif stem in title_stems:
+                score += 10.0 * weight
                 title_matches += 1
             
             # Match exact dans le résumé : +8
             if tok in resume_tokens:
-                score += 8.0
+                score += 8.0 * weight
                 resume_matches += 1
             # Match stem dans le résumé : +5
-            elif any(rs == stem for rs in resume_stems):
-                score += 5.0
+            elif stem in resume_stems:
+                score += 5.0 * weight
                 resume_matches += 1
             
             # Match dans le contenu avec comptage de densité
             occurrences = count_occurrences(tok, doc_tokens, doc_stems)
             if occurrences > 0:
                 density = (occurrences / len(doc_tokens)) * 1000
-                score += min(density * 2, 6)  # Plafonné à 6 points
+                score += min(density * 2, 6) * weight  # Plafonné à 6 points
         
         # Scoring pour tokens EXPANDUS (synonymes) - bonus moindre
         for tok in expanded_tokens:
@@ -276,9 +624,9 @@ def find_relevant_docs(question: str, top_k: int = 5) -> dict:
                 continue  # Déjà compté
             stem = simple_stem(tok)
             
-            if tok in title_tokens or any(ts == stem for ts in title_stems):
+            if tok in title_tokens or stem in title_stems:
                 score += 3.0
-            if tok in resume_tokens or any(rs == stem for rs in resume_stems):
+            if tok in resume_tokens or stem in resume_stems:
                 score += 2.0
         
         # Bonus si TOUS les mots-clés importants sont présents dans le titre ou résumé
@@ -291,24 +639,39 @@ def find_relevant_docs(question: str, top_k: int = 5) -> dict:
             scored.append({"score": score, "doc": doc, "title_matches": title_matches})
     
     scored.sort(key=lambda x: x["score"], reverse=True)
+
+    # Un document et ses passages PDF partagent la même URL : on garde le mieux classé
+    seen_urls: set[str] = set()
+    unique: list[dict] = []
+    for s in scored:
+        if s["doc"]["url"] not in seen_urls:
+            seen_urls.add(s["doc"]["url"])
+            unique.append(s)
+    scored = unique
     
     # Filtrer par seuil de pertinence minimum
     relevant_docs = [s for s in scored if s["score"] >= MIN_RELEVANCE_SCORE]
     
     # Log pour debug
-    print(f"[app.py] Query tokens: {q_tokens}")
-    print(f"[app.py] Top scores: {[(s['doc']['title'][:40], s['score']) for s in scored[:5]]}")
-    print(f"[app.py] Docs above threshold ({MIN_RELEVANCE_SCORE}): {len(relevant_docs)}")
+    if log:
+        print(f"[app.py] Query tokens: {q_tokens}")
+        if corrections:
+            print(f"[app.py] Corrections: {corrections}")
+        print(f"[app.py] Top scores: {[(s['doc']['title'][:40], s['score']) for s in scored[:5]]}")
+        print(f"[app.py] Docs above threshold ({MIN_RELEVANCE_SCORE}): {len(relevant_docs)}")
     
     return {
         "docs": [s["doc"] for s in relevant_docs[:top_k]],
         "has_relevant_results": len(relevant_docs) > 0,
-        "top_score": scored[0]["score"] if scored else 0
+        "top_score": scored[0]["score"] if scored else 0,
+        "corrections": corrections,
     }
 
 
 @app.route("/")
 def index():
+    if PRERENDERED:
+        return send_prerendered("index.html")
     fiches = sorted(load_fiches(), key=lambda f: f.get("title", "").lower())
     ressources = sorted(load_ressources(), key=lambda r: r.get("title", "").lower())
     faq_page = load_page(FAQ_PATH)
@@ -316,9 +679,89 @@ def index():
     return render_template("index.html", fiches=fiches, ressources=ressources, faq=faq_page, home=home_page)
 
 
+@app.get("/fiches/<slug>/")
+def fiche_page(slug: str):
+    if PRERENDERED:
+        return send_prerendered(f"fiches/{slug}/index.html")
+    fiche = next((f for f in load_fiches() if f.get("slug") == slug), None)
+    if fiche is None:
+        abort(404)
+    return render_template("fiche.html", doc=fiche)
+
+
+@app.get("/ressources/<slug>/")
+def ressource_page(slug: str):
+    if PRERENDERED:
+        return send_prerendered(f"ressources/{slug}/index.html")
+    ressource = next((r for r in load_ressources() if r.get("slug") == slug), None)
+    if ressource is None:
+        abort(404)
+    return render_template("ressource.html", doc=ressource)
+
+
+@app.get("/assets/<path:name>")
+def prerendered_asset(name: str):
+    return send_prerendered(f"assets/{name}", immutable=True)
+
+
+SEARCH_MAX_TOP_K = 20
+SEARCH_MAX_BATCH = 50
+
+
+def _search(query: str, top_k: int) -> dict:
+    result = find_relevant_docs(query, top_k=top_k, log=False)
+    return {
+        "query": query,
+        "results": [doc_summary(doc) for doc in result["docs"]],
+        "has_relevant_results": result["has_relevant_results"],
+        "top_score": result["top_score"],
+        "corrections": result["corrections"],
+    }
+
+
+def _top_k_arg(value, default: int = 5) -> int:
+    try:
+        return max(1, min(int(value), SEARCH_MAX_TOP_K))
+    except (TypeError, ValueError):
+        return default
+
+
+@app.get("/search")
+def search():
+    """Recherche documentaire seule (sans appel au modèle)."""
+    query = (request.args.get("q") or "").strip()
+    if not query:
+        return jsonify({"error": "Paramètre q manquant"}), 400
+    return jsonify(_search(query, _top_k_arg(request.args.get("top_k"))))
+
+
+@app.post("/search")
+def search_batch():
+    """Forme groupée : {"queries": [...], "top_k": 5}."""
+    payload = request.get_json(silent=True)
+    if not isinstance(payload, dict):
+        return jsonify({"error": "Corps JSON attendu : un objet"}), 400
+    queries = payload.get("queries")
+    if not isinstance(queries, list) or not queries:
+        return jsonify({"error": "Champ queries manquant"}), 400
+    if len(queries) > SEARCH_MAX_BATCH:
+        return jsonify({"error": f"Au plus {SEARCH_MAX_BATCH} requêtes par appel"}), 400
+    if not all(isinstance(q, str) for q in queries):
+        return jsonify({"error": "Chaque requête doit être une chaîne"}), 400
+    top_k = _top_k_arg(payload.get("top_k"))
+    return jsonify({"results": [_search(q.strip(), top_k) for q in queries]})
+
+
+@app.get("/search/suggest")
+def search_suggest():
+    """Autocomplétion par préfixe sur les titres, pour la saisie en cours."""
+    query = request.args.get("q") or ""
+    return jsonify({"query": query, "suggestions": suggest_docs(query, limit=_top_k_arg(request.args.get("limit"), 8))})
+
+
 @app.post("/chat")
 def chat():
-    if client is None:
+    if upstream is None:
         return jsonify({"error": "OPENAI_API_KEY non configurée côté serveur."}), 500
 
     payload = request.get_json(silent=True) or {}
@@ -330,9 +773,9 @@ def chat():
     if not message:
         return jsonify({"error": "Message vide"}), 400
 
-    # Combiner l'historique et le message actuel pour une meilleure recherche
+    # Combiner les derniers échanges et le message actuel pour une meilleure recherche
     search_query = " ".join(
-        [h.get("content", "") for h in history if h.get("role") == "user"] + [message]
+        [h.get("content", "") for h in history[-6:] if h.get("role") == "user"] + [message]
     )
     search_result = find_relevant_docs(search_query, top_k=5)
     relevant_docs = search_result["docs"]
@@ -344,14 +787,7 @@ def chat():
         context_parts.append(
             f"[{doc['type'].upper()}] \"{doc['title']}\"\nURL: {doc['url']}\nContenu:\n{doc['text']}"
         )
-        sources.append(
-            {
-                "type": doc["type"],
-                "title": doc["title"],
-                "url": doc["url"],
-                "resume": doc.get("resume", ""),
-            }
-        )
+        sources.append(doc_summary(doc))
 
     # Construire le contexte en fonction de la pertinence
     relevance_note = ""
@@ -385,31 +821,67 @@ Format de réponse idéal :
 - Sinon : cite 1 à 3 fiches/ressources VRAIMENT pertinentes avec leur URL et 1 phrase de justification chacune{relevance_note}"""
 
     try:
-        # Construire les messages avec l'historique
-        messages = [{"role": "system", "content": system_prompt}]
-        
-        # Ajouter l'historique de conversation (limité aux 6 derniers messages)
-        recent_history = history[-6:] if len(history) > 6 else history
-        for h in recent_history:
-            if h.get("role") in ("user", "assistant"):
-                messages.append({"role": h["role"], "content": h.get("content", "")})
-        
-        # Ajouter le message actuel avec le contexte
-        messages.append({
-            "role": "user",
-            "content": f"Contexte documentaire :\n{context}\n\nQuestion de l'utilisateur : {message}",
-        })
-        
-        completion = client.chat.completions.create(
-            model=OPENAI_MODEL,
-            messages=messages,
+        with admission.admit(client_key()):
+            # Construire les messages avec l'historique
+            messages = [{"role": "system", "content": system_prompt}]
+            
+            # Historique ramené au budget de tokens : les anciens échanges sont intégrés
+            # au résumé renvoyé par le client, les récents gardés tels quels
+            summary, summarized, recent_history = compactor.compact(
+                history, HISTORY_TOKEN_BUDGET, load_memory(payload.get("memory"))
+            )
+            if summary:
+                # Résumé produit à partir de texte utilisateur : jamais dans un message système
+                messages.append({
+                    "role": "user",
+                    "content": f"[Résumé des échanges précédents, pour contexte uniquement]\n{summary}",
+                })
+            messages.extend(recent_history)
+            
+            # Ajouter le message actuel avec le contexte
+            messages.append({
+                "role": "user",
+                "content": f"Contexte documentaire :\n{context}\n\nQuestion de l'utilisateur : {message}",
+            })
+            
+            completion = upstream.complete(messages)
+    except AdmissionRejected as exc:
+        return (
+            jsonify({"error": "Trop de demandes en cours, merci de réessayer dans quelques instants.", "reason": exc.reason}),
+            429,
+            {"Retry-After": exc.retry_after_header},
+        )
+    except CircuitOpenError as exc:
+        return (
+            jsonify({"error": "Le service OpenAI est momentanément indisponible, merci de réessayer plus tard."}),
+            503,
+            {"Retry-After": str(max(1, math.ceil(exc.retry_after)))},
         )
+    except DeadlineExceeded:
+        return jsonify({"error": "Délai de réponse OpenAI dépassé."}), 504
     except Exception as exc:  # noqa: BLE001
+        if is_retryable(exc):
+            # Erreur transitoire persistante après les reprises
+            return jsonify({"error": "Le service OpenAI ne répond pas correctement, merci de réessayer plus tard."}), 502
         return jsonify({"error": f"Erreur lors de l'appel OpenAI: {exc}"}), 500
 
     answer = completion.choices[0].message.content if completion.choices else ""  # type: ignore[attr-defined]
 
-    return jsonify({"answer": answer, "sources": sources})
+    return jsonify({
+        "answer": answer,
+        "sources": sources,
+        # Le client oublie les `summarized` premiers messages envoyés et renvoie `token`
+        "memory": {"token": memory_signer.dumps(summary) if summary and memory_signer else None, "summarized": summarized},
+    })
+
+
+@app.get("/stats")
+def stats():
+    return jsonify({
+        "admission": admission.snapshot(),
+        "upstream": upstream.snapshot() if upstream else None,
+        "history": compactor.snapshot(),
+    })
 
 
 if __name__ == "__main__":
@@ -48,6 +48,4 @@ fs.writeFileSync(CHAT_OUTPUT, template, 'utf8');
 console.log(`\nGenerated ${CHAT_OUTPUT}`);
 console.log(`Total: ${fiches.length} fiches, ${ressources.length} ressources`);
 
-// Générer aussi l'index.html statique
-console.log('\nGenerating static index.html...');
-require('./generate_static.js');
+// Les pages statiques (public/) sont générées par build_static.py
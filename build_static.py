@@ -0,0 +1,187 @@
+"""Pré-rendu statique du site depuis les vrais templates Jinja.
+
+Génère dans `public/` :
+- `index.html` et une page par fiche / ressource (`fiches/<slug>/index.html`, ...) ;
+- les assets de `static/` renommés avec leur hash de contenu (`assets/app.<hash>.css`) ;
+- des variantes `.gz` et `.br` de chaque fichier ;
+- `manifest.json` (ETag de chaque fichier + hash des sources) lu par `app.py`.
+
+Usage : python3 build_static.py
+"""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import shutil
+import time
+from typing import Optional
+
+from jinja2 import Environment, FileSystemLoader, select_autoescape
+
+try:
+    import brotli
+except ImportError:  # brotli est optionnel : on ne produit alors que les .gz
+    brotli = None
+
+APP_ROOT = os.path.dirname(os.path.abspath(__file__))
+TEMPLATES_DIR = os.path.join(APP_ROOT, "templates")
+STATIC_DIR = os.path.join(APP_ROOT, "static")
+DOC_DIR = os.path.join(APP_ROOT, "doc")
+OUTPUT_DIR = os.path.join(APP_ROOT, "public")
+MANIFEST_PATH = os.path.join(OUTPUT_DIR, "manifest.json")
+
+# Données lues par les templates (les autres fichiers de doc/ n'affectent pas le rendu)
+DOC_SOURCES = ("fiches.json", "ressources.json", "faq.json", "home.json")
+
+# Répertoires générés (vidés à chaque build)
+GENERATED_DIRS = ("assets", "fiches", "ressources")
+
+# Types de fichiers qui gagnent à être compressés
+COMPRESSIBLE = {".html", ".css", ".js", ".json", ".svg", ".txt"}
+
+
+def content_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()[:16]
+
+
+def _source_files() -> list[str]:
+    paths: list[str] = []
+    for root in (TEMPLATES_DIR, STATIC_DIR):
+        for dirpath, dirnames, filenames in os.walk(root):
+            dirnames.sort()
+            paths.extend(os.path.join(dirpath, name) for name in sorted(filenames))
+    paths.extend(os.path.join(DOC_DIR, name) for name in DOC_SOURCES)
+    return paths
+
+
+def source_hash() -> str:
+    """Hash des templates, assets et données rendues : change dès qu'une source change."""
+    h = hashlib.sha256()
+    for path in _source_files():
+        h.update(os.path.relpath(path, APP_ROOT).encode())
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                h.update(f.read())
+    return h.hexdigest()[:16]
+
+
+def load_manifest() -> Optional[dict]:
+    """Renvoie le manifeste du dernier build, ou None s'il est absent ou obsolète."""
+    if not os.path.exists(MANIFEST_PATH):
+        return None
+    with open(MANIFEST_PATH, "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+    if manifest.get("source_hash") != source_hash():
+        return None
+    return manifest
+
+
+def load_json(path: str):
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def write_variants(path: str, data: bytes) -> None:
+    """Écrit le fichier et, si utile, ses variantes gzip et brotli.
+
+    Les variantes d'un build précédent sont supprimées d'abord : `app.py` sert
+    tout `.br` / `.gz` présent, qui ne doit jamais être plus ancien que l'original.
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    for ext in (".gz", ".br"):
+        if os.path.exists(path + ext):
+            os.remove(path + ext)
+    with open(path, "wb") as f:
+        f.write(data)
+    if os.path.splitext(path)[1] not in COMPRESSIBLE:
+        return
+    with open(path + ".gz", "wb") as f:
+        f.write(gzip.compress(data, compresslevel=9, mtime=0))
+    if brotli is not None:
+        with open(path + ".br", "wb") as f:
+            f.write(brotli.compress(data, quality=11))
+
+
+def build_assets(output_dir: str, files: dict[str, str]) -> dict[str, str]:
+    """Copie les fichiers de `static/` sous un nom contenant leur hash.
+
+    Renvoie la correspondance nom logique (`css/app.css`) -> chemin publié
+    (`assets/app.<hash>.css`).
+    """
+    assets: dict[str, str] = {}
+    for dirpath, _, filenames in os.walk(STATIC_DIR):
+        for name in sorted(filenames):
+            src = os.path.join(dirpath, name)
+            logical = os.path.relpath(src, STATIC_DIR).replace(os.sep, "/")
+            with open(src, "rb") as f:
+                data = f.read()
+            digest = content_hash(data)
+            stem, ext = os.path.splitext(name)
+            rel = f"assets/{stem}.{digest[:10]}{ext}"
+            write_variants(os.path.join(output_dir, rel), data)
+            assets[logical] = rel
+            files[rel] = digest
+    return assets
+
+
+def build(output_dir: str = OUTPUT_DIR) -> dict:
+    for name in GENERATED_DIRS:
+        shutil.rmtree(os.path.join(output_dir, name), ignore_errors=True)
+
+    files: dict[str, str] = {}
+    assets = build_assets(output_dir, files)
+
+    env = Environment(
+        loader=FileSystemLoader(TEMPLATES_DIR),
+        autoescape=select_autoescape(["html"]),
+    )
+    env.globals["asset_url"] = lambda name: "/" + assets[name]
+
+    fiches = sorted(load_json(os.path.join(DOC_DIR, "fiches.json")) or [], key=lambda f: f.get("title", "").lower())
+    ressources = sorted(load_json(os.path.join(DOC_DIR, "ressources.json")) or [], key=lambda r: r.get("title", "").lower())
+    faq = load_json(os.path.join(DOC_DIR, "faq.json"))
+    home = load_json(os.path.join(DOC_DIR, "home.json"))
+
+    pages: dict[str, str] = {
+        "index.html": env.get_template("index.html").render(fiches=fiches, ressources=ressources, faq=faq, home=home),
+    }
+    for kind, template, items in (("fiches", "fiche.html", fiches), ("ressources", "ressource.html", ressources)):
+        tpl = env.get_template(template)
+        for item in items:
+            slug = item.get("slug") or ""
+            if not slug or "/" in slug or slug.startswith("."):
+                continue
+            pages[f"{kind}/{slug}/index.html"] = tpl.render(doc=item)
+
+    for rel, html in pages.items():
+        data = html.encode("utf-8")
+        write_variants(os.path.join(output_dir, rel), data)
+        files[rel] = content_hash(data)
+
+    manifest = {
+        "source_hash": source_hash(),
+        "assets": assets,
+        "files": files,
+    }
+    with open(os.path.join(output_dir, "manifest.json"), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    return manifest
+
+
+def guess_mimetype(rel: str) -> str:
+    return mimetypes.guess_type(rel)[0] or "application/octet-stream"
+
+
+if __name__ == "__main__":
+    start = time.perf_counter()
+    result = build()
+    pages = sum(1 for rel in result["files"] if rel.endswith(".html"))
+    print(f"Generated {pages} pages and {len(result['assets'])} assets in {OUTPUT_DIR}")
+    print(f"Brotli: {'oui' if brotli is not None else 'non (pip install brotli)'}")
+    print(f"Done in {time.perf_counter() - start:.2f}s")
@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import math
+import threading
+from typing import Callable, Optional
+
+# Budget de tokens alloué à l'historique, par modèle
+HISTORY_TOKEN_BUDGETS = {
+    "gpt-4.1": 3000,
+    "gpt-4.1-mini": 2000,
+    "gpt-4.1-nano": 1000,
+    "gpt-4o": 3000,
+    "gpt-4o-mini": 2000,
+}
+DEFAULT_HISTORY_TOKEN_BUDGET = 1500
+
+# Surcoût approximatif par message (rôle, séparateurs)
+MESSAGE_OVERHEAD_TOKENS = 4
+
+# Signature du résumeur : (résumé précédent ou "", messages à intégrer) -> nouveau résumé
+SummarizeFn = Callable[[str, list[dict]], str]
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimation locale du nombre de tokens (~4 caractères par token en français)."""
+    return math.ceil(len(text) / 4) if text else 0
+
+
+def message_tokens(message: dict) -> int:
+    return estimate_tokens(message.get("content", "")) + MESSAGE_OVERHEAD_TOKENS
+
+
+def history_budget(model: str) -> int:
+    return HISTORY_TOKEN_BUDGETS.get(model, DEFAULT_HISTORY_TOKEN_BUDGET)
+
+
+class HistoryCompactor:
+    """Réduit l'historique à un budget de tokens.
+
+    Le client renvoie à chaque tour le résumé produit au tour précédent et les
+    seuls messages qu'il ne couvre pas encore. Quand ces messages dépassent le
+    budget, les plus anciens sont intégrés au résumé (un seul appel, sur ces
+    messages uniquement) et le client les oublie : chaque message n'est résumé
+    qu'une fois. Le dernier échange est toujours gardé tel quel, et après une
+    compaction on ne garde que la moitié du budget pour ne pas résumer à chaque tour.
+
+    Sans `summarize`, les plus anciens messages sont simplement écartés de la
+    requête (le client les garde).
+    """
+
+    def __init__(self, summarize: Optional[SummarizeFn], summary_budget: int = 300):
+        self._summarize = summarize
+        self.summary_budget = summary_budget
+        self._lock = threading.Lock()
+        self._stats = {"compacted": 0, "summaries": 0, "summary_errors": 0}
+
+    def _count(self, key: str) -> None:
+        with self._lock:
+            self._stats[key] += 1
+
+    def compact(self, history: list[dict], budget: int, summary: str = "") -> tuple[str, int, list[dict]]:
+        """Renvoie (résumé à jour, nombre de messages de `history` intégrés au résumé,
+        messages à garder tels quels)."""
+        messages = [
+            {"role": h["role"], "content": str(h.get("content", ""))}
+            for h in history
+            if isinstance(h, dict) and h.get("role") in ("user", "assistant")
+        ]
+        available = budget - self.summary_budget
+        if sum(message_tokens(m) for m in messages) <= available:
+            return summary, 0, messages
+
+        # Dernier échange toujours gardé, puis les plus récents dans la moitié du budget
+        keep_from = max(0, len(messages) - 2)
+        used = sum(message_tokens(m) for m in messages[keep_from:])
+        while keep_from > 0:
+            cost = message_tokens(messages[keep_from - 1])
+            if used + cost > available // 2:
+                break
+            keep_from -= 1
+            used += cost
+        self._count("compacted")
+        if keep_from == 0:
+            return summary, 0, messages
+        if self._summarize is None:
+            return summary, 0, messages[keep_from:]
+
+        try:
+            updated = self._summarize(summary, messages[:keep_from])
+        except Exception:  # noqa: BLE001
+            # Pas de résumé : on coupe pour ce tour, le client garde les messages
+            self._count("summary_errors")
+            return summary, 0, messages[keep_from:]
+        self._count("summaries")
+        return updated.strip()[: self.summary_budget * 4], keep_from, messages[keep_from:]
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return dict(self._stats)
@@ -0,0 +1,210 @@
+"""Ingestion du contenu des PDF liés aux fiches et ressources.
+
+Télécharge les `pdf_url` capturés par le scraper (session HTTP poolée), extrait
+le texte dans un pool de processus, met en cache le texte extrait par hash du
+PDF (un PDF inchangé n'est jamais ré-analysé) et écrit les passages dans
+`doc/pdf_passages.json`, chargé par `app.py` avec le reste du corpus.
+
+Usage :
+    python3 ingest_pdfs.py                     # téléchargement depuis le site
+    python3 ingest_pdfs.py --pdf-dir DIR       # hors ligne : DIR/<slug>.pdf
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import io
+import json
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+APP_ROOT = os.path.dirname(os.path.abspath(__file__))
+DOC_DIR = os.path.join(APP_ROOT, "doc")
+CACHE_DIR = os.path.join(APP_ROOT, ".cache", "pdf_text")
+OUTPUT_PATH = os.path.join(DOC_DIR, "pdf_passages.json")
+
+# Taille visée d'un passage (en caractères)
+PASSAGE_CHARS = 1200
+
+
+def make_session(pool_size: int) -> requests.Session:
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=pool_size,
+        pool_maxsize=pool_size,
+        max_retries=Retry(total=3, backoff_factor=0.5, status_forcelist=(429, 500, 502, 503, 504)),
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def collect_targets() -> list[dict]:
+    """Fiches et ressources ayant un lien PDF."""
+    targets: list[dict] = []
+    for kind, filename in (("fiche", "fiches.json"), ("ressource", "ressources.json")):
+        path = os.path.join(DOC_DIR, filename)
+        if not os.path.exists(path):
+            continue
+        with open(path, "r", encoding="utf-8") as f:
+            for item in json.load(f):
+                if item.get("pdf_url"):
+                    targets.append(
+                        {"type": kind, "slug": item.get("slug", ""), "url": item.get("url", ""), "pdf_url": item["pdf_url"]}
+                    )
+    return targets
+
+
+def fetch_pdf(session: requests.Session, target: dict, pdf_dir: Optional[str]) -> Optional[bytes]:
+    if pdf_dir:
+        path = os.path.join(pdf_dir, f"{target['slug']}.pdf")
+        if not os.path.exists(path):
+            return None
+        with open(path, "rb") as f:
+            data = f.read()
+    else:
+        try:
+            resp = session.get(target["pdf_url"], timeout=30)
+            resp.raise_for_status()
+        except requests.RequestException as exc:
+            print(f"  Download error, skip {target['pdf_url']}: {exc}")
+            return None
+        data = resp.content
+    # Certains liens « Télécharger » renvoient une page HTML et non un PDF
+    if not data.startswith(b"%PDF"):
+        print(f"  Not a PDF, skip {target['pdf_url']}")
+        return None
+    return data
+
+
+def extract_text(data: bytes) -> tuple[str, int, float, Optional[str]]:
+    """Extrait le texte d'un PDF (exécuté dans un processus du pool).
+
+    Renvoie (texte, nombre de pages, temps CPU consommé, erreur ou None) : un PDF
+    illisible donne un texte vide plutôt que d'interrompre toute l'ingestion.
+    """
+    from pypdf import PdfReader
+
+    start = time.process_time()
+    try:
+        reader = PdfReader(io.BytesIO(data))
+        pages = [page.extract_text() or "" for page in reader.pages]
+    except Exception as exc:  # noqa: BLE001
+        return "", 0, time.process_time() - start, f"{type(exc).__name__}: {exc}"
+    return "\n\n".join(pages), len(pages), time.process_time() - start, None
+
+
+def split_passages(text: str, max_chars: int = PASSAGE_CHARS) -> list[str]:
+    """Découpe le texte en passages d'environ `max_chars` caractères, sur les fins de ligne."""
+    passages: list[str] = []
+    current = ""
+    for line in text.splitlines():
+        line = re.sub(r"\s+", " ", line).strip()
+        if not line:
+            continue
+        if current and len(current) + len(line) + 1 > max_chars:
+            passages.append(current)
+            current = ""
+        current = f"{current} {line}" if current else line
+    if current:
+        passages.append(current)
+    return passages
+
+
+def ingest(
+    workers: int,
+    pdf_dir: Optional[str] = None,
+    output_path: str = OUTPUT_PATH,
+    targets: Optional[list[dict]] = None,
+    cache_dir: str = CACHE_DIR,
+) -> dict:
+    if targets is None:
+        targets = collect_targets()
+    print(f"{len(targets)} documents avec PDF")
+
+    session = make_session(pool_size=8)
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        downloads = list(pool.map(lambda t: fetch_pdf(session, t, pdf_dir), targets))
+
+    os.makedirs(cache_dir, exist_ok=True)
+    texts: dict[str, str] = {}
+    to_parse: dict[str, bytes] = {}
+    digests: list[Optional[str]] = []
+    for data in downloads:
+        if data is None:
+            digests.append(None)
+            continue
+        digest = hashlib.sha256(data).hexdigest()
+        digests.append(digest)
+        cache_path = os.path.join(cache_dir, f"{digest}.txt")
+        if digest in texts or digest in to_parse:
+            continue
+        if os.path.exists(cache_path):
+            with open(cache_path, "r", encoding="utf-8") as f:
+                texts[digest] = f.read()
+        else:
+            to_parse[digest] = data
+
+    total_pages = 0
+    cpu_seconds = 0.0
+    failed = 0
+    start = time.perf_counter()
+    if to_parse:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = pool.map(extract_text, to_parse.values())
+            for digest, (text, pages, cpu, error) in zip(to_parse, results):
+                texts[digest] = text
+                total_pages += pages
+                cpu_seconds += cpu
+                if error:
+                    # Pas de cache : le PDF sera retenté au prochain passage
+                    failed += 1
+                    print(f"  Extraction error, skip {digest[:12]}: {error}")
+                    continue
+                with open(os.path.join(cache_dir, f"{digest}.txt"), "w", encoding="utf-8") as f:
+                    f.write(text)
+    wall = time.perf_counter() - start
+
+    entries = []
+    for target, digest in zip(targets, digests):
+        if digest is None:
+            continue
+        passages = split_passages(texts[digest])
+        if passages:
+            entries.append({**target, "sha256": digest, "passages": passages})
+
+    with open(output_path, "w", encoding="utf-8") as f:
+        json.dump(entries, f, ensure_ascii=False, indent=2)
+
+    stats = {
+        "documents": len(entries),
+        "parsed": len(to_parse) - failed,
+        "failed": failed,
+        "cached": len(texts) - len(to_parse),
+        "pages": total_pages,
+        "wall_seconds": round(wall, 2),
+        "pages_per_second": round(total_pages / wall, 1) if wall else 0.0,
+        "pages_per_core_second": round(total_pages / cpu_seconds, 1) if cpu_seconds else 0.0,
+    }
+    print(f"Saved {len(entries)} documents to {output_path}")
+    print(
+        f"Parsed {stats['parsed']} PDF ({stats['cached']} from cache, {failed} failed), {total_pages} pages in {stats['wall_seconds']}s "
+        f"with {workers} workers: {stats['pages_per_second']} pages/s, {stats['pages_per_core_second']} pages/s/core"
+    )
+    return stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="processus d'extraction")
+    parser.add_argument("--pdf-dir", help="lire <pdf-dir>/<slug>.pdf au lieu de télécharger")
+    args = parser.parse_args()
+    ingest(args.workers, args.pdf_dir)
@@ -322,8 +322,9 @@ exports.handler = async (event, _context) => {
     };
   }
 
-  // Combiner l'historique et le message actuel pour une meilleure recherche
+  // Combiner les derniers échanges et le message actuel pour une meilleure recherche
   const searchQuery = history
+    .slice(-6)
     .filter(h => h.role === 'user')
     .map(h => h.content)
     .concat([message])
@@ -0,0 +1,225 @@
+document.addEventListener('DOMContentLoaded', function() {
+  const input = document.getElementById('chat-input');
+  const sendBtn = document.getElementById('chat-send');
+  const messagesContainer = document.getElementById('chat-messages');
+  const itemSearch = document.getElementById('item-search');
+  const fichesList = document.getElementById('fiches-list');
+  const ressourcesList = document.getElementById('ressources-list');
+  const tabs = document.querySelectorAll('.sidebar-tab');
+  const suggestionBtns = document.querySelectorAll('.suggestion-btn');
+  const resetBtn = document.getElementById('reset-btn');
+  let conversationHistory = [];
+  // Résumé signé des anciens échanges, produit par le serveur
+  let memoryToken = null;
+  let currentTab = 'fiches';
+
+  // Tab switching
+  tabs.forEach(tab => {
+    tab.addEventListener('click', function() {
+      tabs.forEach(t => t.classList.remove('active'));
+      this.classList.add('active');
+      currentTab = this.dataset.tab;
+      fichesList.style.display = currentTab === 'fiches' ? 'block' : 'none';
+      ressourcesList.style.display = currentTab === 'ressources' ? 'block' : 'none';
+    });
+  });
+
+  // Search
+  itemSearch.addEventListener('input', function() {
+    const query = this.value.toLowerCase();
+    const list = currentTab === 'fiches' ? fichesList : ressourcesList;
+    list.querySelectorAll('.item-card').forEach(card => {
+      const title = card.dataset.title.toLowerCase();
+      card.style.display = title.includes(query) ? 'block' : 'none';
+    });
+  });
+
+  // Click on item card
+  document.querySelectorAll('.item-card').forEach(card => {
+    card.addEventListener('click', function() {
+      window.open(this.dataset.url, '_blank');
+    });
+  });
+
+  // Suggestions
+  suggestionBtns.forEach(btn => {
+    btn.addEventListener('click', function() {
+      input.value = this.dataset.question;
+      sendMessage();
+    });
+  });
+
+  // Reset conversation
+  resetBtn.addEventListener('click', function() {
+    if (confirm('Voulez-vous vraiment réinitialiser la conversation ?')) {
+      conversationHistory = [];
+      memoryToken = null;
+      messagesContainer.innerHTML = `
+        <div class="welcome-message">
+          <h2>👋 Bienvenue !</h2>
+          <p>Je vous oriente vers les fiches et ressources pertinentes du site.<br>L'assistant garde en mémoire le fil de la conversation.</p>
+          <div class="welcome-suggestions">
+            <button class="suggestion-btn" data-question="Comment se former sur les enjeux de transition écologique ?">Se former aux transitions</button>
+            <button class="suggestion-btn" data-question="Comment financer la transition écologique de ma collectivité ?">Financer la transition</button>
+            <button class="suggestion-btn" data-question="Comment lutter contre la précarité énergétique ?">Précarité énergétique</button>
+          </div>
+        </div>
+      `;
+      // Re-bind suggestion buttons
+      messagesContainer.querySelectorAll('.suggestion-btn').forEach(btn => {
+        btn.addEventListener('click', function() {
+          input.value = this.dataset.question;
+          sendMessage();
+        });
+      });
+    }
+  });
+
+
+  async function sendMessage() {
+    const text = (input.value || '').trim();
+    if (!text) return;
+
+    const welcome = messagesContainer.querySelector('.welcome-message');
+    if (welcome) welcome.remove();
+
+    const userMsg = document.createElement('div');
+    userMsg.className = 'message user';
+    userMsg.innerHTML = `
+      <div class="message-avatar">👤</div>
+      <div class="message-content">${escapeHtml(text)}</div>
+    `;
+    messagesContainer.appendChild(userMsg);
+    messagesContainer.scrollTop = messagesContainer.scrollHeight;
+
+    input.value = '';
+    sendBtn.disabled = true;
+
+    const loadingMsg = document.createElement('div');
+    loadingMsg.className = 'message assistant';
+    loadingMsg.innerHTML = `
+      <div class="message-avatar">🌱</div>
+      <div class="message-content">
+        <div class="loading-dots"><span></span><span></span><span></span></div>
+      </div>
+    `;
+    messagesContainer.appendChild(loadingMsg);
+    messagesContainer.scrollTop = messagesContainer.scrollHeight;
+
+    try {
+      const chatEndpoint = window.location.hostname === 'localhost' || window.location.hostname === '127.0.0.1' 
+        ? '/chat' 
+        : '/.netlify/functions/chat';
+
+      const resp = await fetch(chatEndpoint, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ message: text, history: conversationHistory, memory: memoryToken })
+      });
+
+      const data = await resp.json();
+
+      if (!resp.ok) {
+        throw new Error(data.error || 'Erreur serveur');
+      }
+
+      loadingMsg.remove();
+
+      const assistantMsg = document.createElement('div');
+      assistantMsg.className = 'message assistant';
+
+      let sourcesHtml = '';
+      if (Array.isArray(data.sources) && data.sources.length > 0) {
+        sourcesHtml = `
+          <div class="sources-inline">
+            <div class="sources-inline-title">📎 Sources consultées</div>
+            ${data.sources.map(s => `
+              <a href="${s.url}" target="_blank" rel="noopener" class="source-chip">
+                <span class="source-chip-icon">${s.type === 'fiche' ? '📄' : '📚'}</span>
+                <span class="source-chip-title">${escapeHtml(s.title)}</span>
+                <div class="source-tooltip">
+                  <div class="source-tooltip-title">${escapeHtml(s.title)}</div>
+                  <div class="source-tooltip-resume">${escapeHtml((s.resume || 'Aucun résumé disponible').substring(0, 300))}${(s.resume || '').length > 300 ? '...' : ''}</div>
+                  <div class="source-tooltip-arrow"></div>
+                </div>
+              </a>
+            `).join('')}
+          </div>
+        `;
+      }
+
+      assistantMsg.innerHTML = `
+        <div class="message-avatar">🌱</div>
+        <div class="message-content">
+          ${renderMarkdown(data.answer || '(pas de réponse)')}
+          ${sourcesHtml}
+        </div>
+      `;
+      messagesContainer.appendChild(assistantMsg);
+      messagesContainer.scrollTop = messagesContainer.scrollHeight;
+
+      // Les messages intégrés au résumé par le serveur ne sont plus renvoyés
+      if (data.memory) {
+        conversationHistory = conversationHistory.slice(data.memory.summarized || 0);
+        memoryToken = data.memory.token;
+      }
+      conversationHistory.push({ role: 'user', content: text });
+      conversationHistory.push({ role: 'assistant', content: data.answer || '' });
+      // Garde-fou si le résumé échoue (ou sans serveur Flask) : on borne la requête
+      if (conversationHistory.length > 40) {
+        conversationHistory = conversationHistory.slice(-40);
+      }
+
+    } catch (err) {
+      loadingMsg.remove();
+      const errorMsg = document.createElement('div');
+      errorMsg.className = 'message assistant';
+      errorMsg.innerHTML = `
+        <div class="message-avatar">⚠️</div>
+        <div class="message-content" style="color: #dc2626;">
+          Erreur : ${escapeHtml(err.message)}
+        </div>
+      `;
+      messagesContainer.appendChild(errorMsg);
+    }
+
+    sendBtn.disabled = false;
+    input.focus();
+  }
+
+  function escapeHtml(text) {
+    const div = document.createElement('div');
+    div.textContent = text;
+    return div.innerHTML;
+  }
+
+  function renderMarkdown(text) {
+    if (!text) return '';
+
+    text = escapeHtml(text);
+    text = text.replace(/^### (.*)$/gm, '<h3>$1</h3>');
+    text = text.replace(/^## (.*)$/gm, '<h3>$1</h3>');
+    text = text.replace(/\*\*(.+?)\*\*/g, '<strong>$1</strong>');
+    text = text.replace(/\[([^\]]+)\]\((https?:\/\/[^\)]+)\)/g, '<a href="$2" target="_blank" rel="noopener">$1</a>');
+    text = text.replace(/\((https?:\/\/[^\)]+)\)/g, '(<a href="$1" target="_blank" rel="noopener">lien</a>)');
+    text = text.replace(/(^|[^"'>])(https?:\/\/[^\s<]+)/g, '$1<a href="$2" target="_blank" rel="noopener">$2</a>');
+    text = text.replace(/^(\d+)\.\s+(.*)$/gm, '<li>$2</li>');
+    text = text.replace(/^[-•]\s+(.*)$/gm, '<li>$1</li>');
+    text = text.replace(/(<li>.*<\/li>\n?)+/g, '<ul>$&</ul>');
+
+    const lines = text.split('\n');
+    return lines.map(line => {
+      if (!line.trim()) return '';
+      if (line.startsWith('<h3>') || line.startsWith('<ul>') || line.startsWith('<li>')) return line;
+      return '<p>' + line + '</p>';
+    }).filter(Boolean).join('');
+  }
+
+  sendBtn.addEventListener('click', sendMessage);
+  input.addEventListener('keydown', function(e) {
+    if (e.key === 'Enter' && !e.shiftKey) {
+      e.preventDefault();
+      sendMessage();
+    }
+  });
+});
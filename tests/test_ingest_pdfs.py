@@ -0,0 +1,39 @@
+"""Ingestion des PDF hors ligne, sur les fixtures de tests/fixtures/pdf."""
+
+from __future__ import annotations
+
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import ingest_pdfs  # noqa: E402
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "pdf")
+
+TARGETS = [
+    {"type": "fiche", "slug": "sample", "url": "https://example.org/sample/", "pdf_url": "https://example.org/sample.pdf"},
+    {"type": "fiche", "slug": "broken", "url": "https://example.org/broken/", "pdf_url": "https://example.org/broken.pdf"},
+]
+
+
+def run(tmp_path) -> tuple[dict, list[dict]]:
+    output = tmp_path / "pdf_passages.json"
+    stats = ingest_pdfs.ingest(
+        2, pdf_dir=FIXTURES_DIR, output_path=str(output), targets=TARGETS, cache_dir=str(tmp_path / "cache")
+    )
+    return stats, json.loads(output.read_text(encoding="utf-8"))
+
+
+def test_ingest_skips_broken_pdf_and_uses_cache(tmp_path):
+    # Premier passage : le PDF valide est analysé, le PDF tronqué n'interrompt rien
+    stats, entries = run(tmp_path)
+    assert (stats["parsed"], stats["failed"], stats["cached"]) == (1, 1, 0)
+    assert [e["slug"] for e in entries] == ["sample"]
+    assert "Methanisation" in entries[0]["passages"][0]
+
+    # Second passage : le texte vient du cache, seul le PDF en échec est retenté
+    stats, cached_entries = run(tmp_path)
+    assert (stats["parsed"], stats["failed"], stats["cached"]) == (0, 1, 1)
+    assert cached_entries == entries
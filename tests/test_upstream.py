@@ -0,0 +1,54 @@
+"""Disjoncteur de `UpstreamClient` face aux erreurs du backend (appels simulés)."""
+
+from __future__ import annotations
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest  # noqa: E402
+
+from upstream import CircuitBreaker, UpstreamClient  # noqa: E402
+
+
+class StatusError(Exception):
+    def __init__(self, status_code: int):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+
+def failing(status_code: int):
+    calls = []
+
+    def call(model: str, messages: list, timeout: float):
+        calls.append(model)
+        raise StatusError(status_code)
+
+    return call, calls
+
+
+def make_client(call) -> UpstreamClient:
+    return UpstreamClient(call, "primary", breaker=CircuitBreaker(failure_threshold=2), sleep=lambda _: None)
+
+
+def test_rate_limit_does_not_open_circuit():
+    call, calls = failing(429)
+    client = make_client(call)
+    for _ in range(2):
+        with pytest.raises(StatusError):
+            client.complete([{"role": "user", "content": "bonjour"}])
+    assert client.breaker.state == "closed"
+    # Chaque appel a bien épuisé ses reprises
+    assert len(calls) == 2 * (client.max_retries + 1)
+
+
+def test_one_failure_per_call_after_retries():
+    call, _ = failing(503)
+    client = make_client(call)
+    with pytest.raises(StatusError):
+        client.complete([{"role": "user", "content": "bonjour"}])
+    assert client.breaker.state == "closed"
+    with pytest.raises(StatusError):
+        client.complete([{"role": "user", "content": "bonjour"}])
+    assert client.breaker.state == "open"
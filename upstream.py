@@ -0,0 +1,290 @@
+from __future__ import annotations
+
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Optional
+
+import openai
+
+# Signature d'un appel au modèle : (modèle, messages, timeout en secondes) -> réponse
+CallFn = Callable[[str, list, float], Any]
+
+RETRYABLE_STATUS = {408, 409, 429}
+
+
+class DeadlineExceeded(Exception):
+    """Le délai global de la requête est écoulé."""
+
+
+class CircuitOpenError(Exception):
+    """Le disjoncteur est ouvert : on échoue immédiatement sans appeler le backend."""
+
+    def __init__(self, retry_after: float):
+        super().__init__("circuit ouvert")
+        self.retry_after = retry_after
+
+
+def is_retryable(exc: BaseException) -> bool:
+    """Erreurs transitoires : timeouts, erreurs réseau, 429 et 5xx."""
+    if isinstance(exc, (openai.APIConnectionError, TimeoutError, ConnectionError)):
+        return True
+    status = getattr(exc, "status_code", None)
+    return isinstance(status, int) and (status in RETRYABLE_STATUS or status >= 500)
+
+
+def is_outage(exc: BaseException) -> bool:
+    """Erreurs qui comptent pour le disjoncteur : transitoires, hors limite de débit (429)."""
+    return is_retryable(exc) and getattr(exc, "status_code", None) != 429
+
+
+class CircuitBreaker:
+    """Disjoncteur classique fermé / ouvert / semi-ouvert.
+
+    S'ouvre après `failure_threshold` échecs consécutifs, puis laisse passer une
+    seule requête d'essai au bout de `reset_timeout` secondes.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0, clock: Callable[[], float] = time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._probing = False
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state()
+
+    def _state(self) -> str:
+        if self._opened_at is None:
+            return "closed"
+        if self._clock() - self._opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def allow(self) -> bool:
+        with self._lock:
+            state = self._state()
+            if state == "closed":
+                return True
+            if state == "half_open" and not self._probing:
+                self._probing = True
+                return True
+            return False
+
+    def retry_after(self) -> float:
+        with self._lock:
+            if self._opened_at is None:
+                return 0.0
+            return max(0.0, self.reset_timeout - (self._clock() - self._opened_at))
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._probing = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._probing or self._failures >= self.failure_threshold:
+                self._opened_at = self._clock()
+            self._probing = False
+
+
+class UpstreamClient:
+    """Appel au modèle avec délai global, reprises avec backoff exponentiel + jitter,
+    relance en parallèle (« hedging ») vers un modèle de secours et disjoncteur."""
+
+    def __init__(
+        self,
+        call: CallFn,
+        primary_model: str,
+        fallback_model: Optional[str] = None,
+        hedge_after: Optional[float] = None,
+        deadline: float = 20.0,
+        max_retries: int = 2,
+        base_backoff: float = 0.25,
+        max_backoff: float = 2.0,
+        breaker: Optional[CircuitBreaker] = None,
+        max_workers: int = 16,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+        rng: Optional[random.Random] = None,
+    ):
+        self._call = call
+        self.primary_model = primary_model
+        self.fallback_model = fallback_model
+        self.hedge_after = hedge_after
+        self.deadline = deadline
+        self.max_retries = max_retries
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.breaker = breaker or CircuitBreaker(clock=clock)
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="upstream")
+        self._clock = clock
+        self._sleep = sleep
+        self._rng = rng or random.Random()
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            "calls": 0,
+            "succeeded": 0,
+            "failed": 0,
+            "retries": 0,
+            "hedged": 0,
+            "hedge_wins": 0,
+            "deadline_exceeded": 0,
+            "circuit_rejected": 0,
+        }
+
+    def _count(self, key: str) -> None:
+        with self._stats_lock:
+            self._stats[key] += 1
+
+    def _attempt(self, messages: list, deadline_at: float) -> Any:
+        remaining = deadline_at - self._clock()
+        if remaining <= 0:
+            raise DeadlineExceeded()
+        primary = self._pool.submit(self._call, self.primary_model, messages, remaining)
+        models = {primary: self.primary_model}
+
+        if self.fallback_model and self.hedge_after is not None and self.hedge_after < remaining:
+            done, _ = wait([primary], timeout=self.hedge_after)
+            if not done:
+                self._count("hedged")
+                hedge = self._pool.submit(self._call, self.fallback_model, messages, deadline_at - self._clock())
+                models[hedge] = self.fallback_model
+
+        # Première réponse réussie gagnante ; les appels restants sont annulés s'ils
+        # attendent encore un thread, sinon ils se terminent seuls à leur timeout
+        pending = set(models)
+        last_exc: Optional[BaseException] = None
+        try:
+            while pending:
+                timeout = deadline_at - self._clock()
+                if timeout <= 0:
+                    break
+                done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    exc = fut.exception()
+                    if exc is None:
+                        if models[fut] != self.primary_model:
+                            self._count("hedge_wins")
+                        return fut.result()
+                    last_exc = exc
+            if last_exc is not None and not pending:
+                raise last_exc
+            raise DeadlineExceeded()
+        finally:
+            for fut in pending:
+                fut.cancel()
+
+    def complete(self, messages: list) -> Any:
+        self._count("calls")
+        if not self.breaker.allow():
+            self._count("circuit_rejected")
+            raise CircuitOpenError(self.breaker.retry_after())
+
+        deadline_at = self._clock() + self.deadline
+        attempt = 0
+        while True:
+            try:
+                result = self._attempt(messages, deadline_at)
+            except DeadlineExceeded:
+                self.breaker.record_failure()
+                self._count("deadline_exceeded")
+                self._count("failed")
+                raise
+            except Exception as exc:
+                if is_retryable(exc):
+                    # Backoff exponentiel avec « full jitter »
+                    delay = self._rng.uniform(0, min(self.max_backoff, self.base_backoff * 2**attempt))
+                    if (
+                        attempt < self.max_retries
+                        and self._clock() + delay < deadline_at
+                        and self.breaker.allow()
+                    ):
+                        attempt += 1
+                        self._count("retries")
+                        self._sleep(delay)
+                        continue
+                # Un seul échec compté par appel, une fois les reprises épuisées. Un 429
+                # ou une erreur client (ex. 400) prouvent que le backend répond : le
+                # disjoncteur ne doit pas couper le service pour une limite de débit.
+                if is_outage(exc):
+                    self.breaker.record_failure()
+                else:
+                    self.breaker.record_success()
+                self._count("failed")
+                raise
+            else:
+                self.breaker.record_success()
+                self._count("succeeded")
+                return result
+
+    def snapshot(self) -> dict:
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats["circuit"] = self.breaker.state
+        return stats
+
+
+def _bench(n: int = 200) -> None:
+    """Compare p50/p99 d'un appel direct et d'un appel via `UpstreamClient`
+    contre un backend simulé (latence à queue lourde + erreurs 503)."""
+
+    class StubError(Exception):
+        status_code = 503
+
+    rng = random.Random(42)
+    lock = threading.Lock()
+
+    def stub(model: str, messages: list, timeout: float) -> str:
+        with lock:
+            roll = rng.random()
+            latency = rng.lognormvariate(-3.0, 0.3)  # ~50 ms
+        if roll < 0.05:
+            latency = 1.0  # queue de latence
+        time.sleep(min(latency, timeout))
+        if latency > timeout:
+            raise TimeoutError()
+        if 0.05 <= roll < 0.08:
+            raise StubError()
+        return model
+
+    def percentiles(samples: list[float]) -> str:
+        samples.sort()
+        p50 = samples[len(samples) // 2]
+        p99 = samples[int(len(samples) * 0.99) - 1]
+        return f"p50={p50 * 1000:.0f}ms p99={p99 * 1000:.0f}ms"
+
+    def run(fn: Callable[[], Any]) -> tuple[list[float], int]:
+        latencies, errors = [], 0
+        for _ in range(n):
+            start = time.perf_counter()
+            try:
+                fn()
+            except Exception:  # noqa: BLE001
+                errors += 1
+            latencies.append(time.perf_counter() - start)
+        return latencies, errors
+
+    messages = [{"role": "user", "content": "bench"}]
+    direct, direct_err = run(lambda: stub("primary", messages, 10.0))
+    upstream = UpstreamClient(
+        stub, "primary", fallback_model="fallback", hedge_after=0.15, deadline=2.0, base_backoff=0.02,
+        breaker=CircuitBreaker(failure_threshold=50),
+    )
+    wrapped, wrapped_err = run(lambda: upstream.complete(messages))
+    print(f"direct : {percentiles(direct)} erreurs={direct_err}/{n}")
+    print(f"wrapped: {percentiles(wrapped)} erreurs={wrapped_err}/{n}")
+    print(upstream.snapshot())
+
+
+if __name__ == "__main__":
+    _bench()